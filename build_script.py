@@ -4,39 +4,65 @@ Build script for PyDebFlow.
 Creates a standalone executable using PyInstaller.
 """
 
-import subprocess
+import argparse
+import hashlib
+import importlib.util
+import os
+from importlib import metadata
 import sys
 import shutil
 from pathlib import Path
 
 
+# Committed PyInstaller spec describing the executable
+SPEC_FILE = 'pydebflow.spec'
+
+# Executable produced by the spec (PyInstaller adds .exe on Windows only)
+EXE_PATH = os.path.join('dist', 'PyDebFlow.exe' if os.name == 'nt' else 'PyDebFlow')
+
+# Files copied next to the executable by create_distribution()
+TEMPLATES_DIR = Path('templates')
+
+# Hash of the spec and requirements at the time of the last successful build
+SPEC_HASH_FILE = Path('build') / '.pydebflow_spechash'
+
+# Hash of all build inputs for the executable currently in dist/
+BUILD_HASH_FILE = Path('dist') / '.build_hash'
+
+# Packages bundled into the executable
+REQUIRED_PACKAGES = ['numpy', 'matplotlib', 'scipy']
+OPTIONAL_PACKAGES = ['PyQt6', 'numba', 'rasterio']
+
+
 def check_dependencies():
     """Check that required dependencies are installed."""
     print("Checking dependencies...")
     
-    required = ['numpy', 'matplotlib', 'scipy']
-    optional = ['PyQt6', 'numba', 'rasterio']
+    required = REQUIRED_PACKAGES
+    optional = OPTIONAL_PACKAGES
+    all_pkgs = required + optional + ['PyInstaller']
+    
+    # Only consult the import finders; importing would run every package's
+    # initialisation just to test that it exists
+    installed = {pkg: importlib.util.find_spec(pkg) is not None for pkg in all_pkgs}
     
     missing = []
     for pkg in required:
-        try:
-            __import__(pkg)
+        if installed[pkg]:
             print(f"  ✓ {pkg}")
-        except ImportError:
+        else:
             print(f"  ✗ {pkg} - REQUIRED")
             missing.append(pkg)
     
     for pkg in optional:
-        try:
-            __import__(pkg)
+        if installed[pkg]:
             print(f"  ✓ {pkg}")
-        except ImportError:
+        else:
             print(f"  ⚠ {pkg} - optional")
     
-    try:
-        import PyInstaller
+    if installed['PyInstaller']:
         print(f"  ✓ PyInstaller")
-    except ImportError:
+    else:
         print(f"  ✗ PyInstaller - REQUIRED for building")
         missing.append('pyinstaller')
     
@@ -48,81 +74,103 @@ def check_dependencies():
     return True
 
 
-def clean_build():
-    """Clean previous build artifacts."""
+def _hash_files(paths):
+    """Return a SHA256 digest of the names and contents of the given files."""
+    h = hashlib.sha256()
+    for path in paths:
+        h.update(path.as_posix().encode())
+        h.update(path.read_bytes())
+    return h.hexdigest()
+
+
+def spec_hash():
+    """Return a SHA256 digest of the spec file and requirements.txt."""
+    return _hash_files([Path(SPEC_FILE), Path('requirements.txt')])
+
+
+def environment_versions():
+    """Return the Python version and installed versions of the bundled packages."""
+    versions = [sys.version]
+    for pkg in REQUIRED_PACKAGES + OPTIONAL_PACKAGES + ['PyInstaller']:
+        try:
+            versions.append(f"{pkg}=={metadata.version(pkg)}")
+        except metadata.PackageNotFoundError:
+            versions.append(f"{pkg} not installed")
+    return versions
+
+
+def build_inputs_hash():
+    """Return a SHA256 digest of everything that determines the contents of dist/."""
+    inputs = sorted(Path('src').rglob('*.py')) + sorted(TEMPLATES_DIR.iterdir())
+    inputs += [Path('main.py'), Path(SPEC_FILE), Path('requirements.txt')]
+    
+    # An upgraded interpreter or package changes the bundle too
+    h = hashlib.sha256(_hash_files(inputs).encode())
+    h.update('\n'.join(environment_versions()).encode())
+    return h.hexdigest()
+
+
+def is_up_to_date(build_hash):
+    """Whether dist/ holds an executable built from inputs with this hash."""
+    return (os.path.exists(EXE_PATH) and BUILD_HASH_FILE.exists()
+            and BUILD_HASH_FILE.read_text() == build_hash)
+
+
+def clean_build(full=False):
+    """
+    Clean previous build artifacts.
+    
+    Args:
+        full: Also remove build/. By default it is kept so PyInstaller's
+            analysis cache survives between runs.
+    """
     print("\nCleaning previous build...")
     
-    dirs_to_clean = ['build', 'dist']
+    dirs_to_clean = ['build', 'dist'] if full else ['dist']
     for dir_name in dirs_to_clean:
-        dir_path = Path(dir_name)
-        if dir_path.exists():
-            shutil.rmtree(dir_path)
+        if Path(dir_name).exists():
+            shutil.rmtree(dir_name)
             print(f"  Removed {dir_name}/")
     
-    # Remove .spec files
-    for spec_file in Path('.').glob('*.spec'):
-        spec_file.unlink()
-        print(f"  Removed {spec_file}")
+    # Remove stale auto-generated .spec files (keep the committed one)
+    with os.scandir('.') as entries:
+        for entry in entries:
+            if (entry.name.endswith('.spec') and entry.name.lower() != SPEC_FILE
+                    and entry.is_file()):
+                os.unlink(entry.path)
+                print(f"  Removed {entry.name}")
 
 
 def build_executable():
-    """Build the executable with PyInstaller."""
+    """Build the executable with PyInstaller from pydebflow.spec."""
     print("\nBuilding executable...")
     
-    # PyInstaller options
-    options = [
-        'main.py',
-        '--name=PyDebFlow',
-        '--onefile',
-        '--windowed',  # No console window for GUI
-        '--noconfirm',
-        
-        # Include all source modules
-        '--add-data=src;src',
-        
-        # Hidden imports for dynamic imports
-        '--hidden-import=numpy',
-        '--hidden-import=scipy',
-        '--hidden-import=matplotlib',
-        '--hidden-import=matplotlib.backends.backend_qtagg',
-        
-        # Exclude unnecessary packages to reduce size
-        '--exclude-module=tkinter',
-        '--exclude-module=test',
-        '--exclude-module=unittest',
-    ]
-    
-    # Check if PyQt6 is available
-    try:
-        import PyQt6
-        options.extend([
-            '--hidden-import=PyQt6',
-            '--hidden-import=PyQt6.QtWidgets',
-            '--hidden-import=PyQt6.QtCore',
-            '--hidden-import=PyQt6.QtGui',
-        ])
-    except ImportError:
-        print("  Note: PyQt6 not found, building CLI-only version")
-        options.remove('--windowed')
+    # Run PyInstaller in-process (avoids a second interpreter start-up)
+    from PyInstaller.__main__ import run as pyi_run
     
-    # Check for numba
-    try:
-        import numba
-        options.append('--hidden-import=numba')
-    except ImportError:
-        pass
+    options = [SPEC_FILE, '--noconfirm']
     
-    # Run PyInstaller
-    cmd = [sys.executable, '-m', 'PyInstaller'] + options
-    print(f"  Command: {' '.join(cmd[:5])}...")
+    # PyInstaller re-checks changed modules against its cache by itself;
+    # only discard the cache when the spec or requirements changed
+    current_spec_hash = spec_hash()
+    if not SPEC_HASH_FILE.exists() or SPEC_HASH_FILE.read_text() != current_spec_hash:
+        options.append('--clean')
     
-    result = subprocess.run(cmd, capture_output=True, text=True)
+    print(f"  Command: PyInstaller {' '.join(options)}")
     
-    if result.returncode != 0:
-        print("\n  Build failed!")
-        print(result.stderr)
+    try:
+        pyi_run(options)
+    except SystemExit as e:
+        if e.code not in (None, 0):
+            print(f"\n  Build failed! (exit code {e.code})")
+            return False
+    except Exception as e:
+        print(f"\n  Build failed! {e}")
         return False
     
+    SPEC_HASH_FILE.parent.mkdir(exist_ok=True)
+    SPEC_HASH_FILE.write_text(current_spec_hash)
+    
     print("  Build successful!")
     return True
 
@@ -131,19 +179,15 @@ def verify_build():
     """Verify the built executable."""
     print("\nVerifying build...")
     
-    exe_path = Path('dist/PyDebFlow.exe')
-    if not exe_path.exists():
-        # Try without .exe for non-Windows
-        exe_path = Path('dist/PyDebFlow')
-    
-    if exe_path.exists():
-        size_mb = exe_path.stat().st_size / (1024 * 1024)
-        print(f"  ✓ Executable created: {exe_path}")
-        print(f"  ✓ Size: {size_mb:.1f} MB")
-        return True
-    else:
+    try:
+        size_mb = os.stat(EXE_PATH).st_size / (1024 * 1024)
+    except FileNotFoundError:
         print("  ✗ Executable not found")
         return False
+    
+    print(f"  ✓ Executable created: {EXE_PATH}")
+    print(f"  ✓ Size: {size_mb:.1f} MB")
+    return True
 
 
 def create_distribution():
@@ -151,100 +195,24 @@ def create_distribution():
     print("\nCreating distribution package...")
     
     dist_dir = Path('dist')
+    dist_dir.mkdir(exist_ok=True)
     
-    # Create a sample config file
-    config_content = """{
-    "terrain": {
-        "use_synthetic": true,
-        "synthetic_rows": 100,
-        "synthetic_cols": 80,
-        "cell_size": 10.0,
-        "synthetic_slope": 25.0
-    },
-    "release": {
-        "center_row": 15,
-        "center_col": 40,
-        "radius": 10,
-        "solid_height": 5.0,
-        "fluid_height": 2.0,
-        "solid_fraction": 0.7
-    },
-    "flow": {
-        "solid_density": 2500,
-        "fluid_density": 1100,
-        "basal_friction_angle": 22.0,
-        "voellmy_mu": 0.15,
-        "voellmy_xi": 500
-    },
-    "simulation": {
-        "t_end": 60.0,
-        "output_interval": 1.0
-    },
-    "output": {
-        "output_dir": "./output",
-        "output_format": "npy"
-    }
-}"""
-    
-    config_path = dist_dir / 'sample_config.json'
-    config_path.write_text(config_content)
-    print(f"  Created: {config_path}")
-    
-    # Create README
-    readme_content = """# PyDebFlow
-
-Mass Flow Simulation Tool - r.avaflow Replica
-
-## Quick Start
-
-### GUI Mode
-Double-click `PyDebFlow.exe` to launch the graphical interface.
-
-### Command Line
-```
-PyDebFlow.exe --help
-```
-
-### Run with Config File
-```
-PyDebFlow.exe run --config sample_config.json
-```
-
-## Features
-
-- Two-phase (solid + fluid) mass flow simulation
-- Debris flows, avalanches, and lahars
-- NOC-TVD numerical solver
-- Mohr-Coulomb and Voellmy rheology
-- GeoTIFF and ASCII Grid support
-
-## Presets
-
-- **Debris Flow**: High-density granular-fluid mixture
-- **Snow Avalanche**: Low-density dry powder/wet snow
-- **Volcanic Lahar**: Volcanic mudflow
-
-## Output Files
-
-- `max_height.npy` - Maximum flow height reached
-- `max_velocity.npy` - Maximum velocity reached
-- `max_pressure.npy` - Maximum impact pressure (kPa)
-- `summary.json` - Statistics and metadata
-
-## License
-
-Open source software.
-"""
-    
-    readme_path = dist_dir / 'README.md'
-    readme_path.write_text(readme_content)
-    print(f"  Created: {readme_path}")
+    # Copy the sample config file and README
+    for name in ['sample_config.json', 'README.md']:
+        target = dist_dir / name
+        shutil.copy(TEMPLATES_DIR / name, target)
+        print(f"  Created: {target}")
     
     print("\nDistribution package created in: dist/")
 
 
-def main():
+def main(argv=None):
     """Main build process."""
+    parser = argparse.ArgumentParser(description="Build the PyDebFlow executable")
+    parser.add_argument('--clean', action='store_true',
+                        help='Remove build/ (PyInstaller cache) before building')
+    args = parser.parse_args(argv)
+    
     print("=" * 60)
     print("PyDebFlow Build Script")
     print("=" * 60)
@@ -254,26 +222,32 @@ def main():
         print("\nBuild aborted due to missing dependencies.")
         return 1
     
-    # Clean previous build
-    clean_build()
-    
-    # Build executable
-    if not build_executable():
-        print("\nBuild failed.")
-        return 1
+    build_hash = build_inputs_hash()
+    if not args.clean and is_up_to_date(build_hash):
+        print("\nUp-to-date: nothing changed since the last build")
+    else:
+        # Clean previous build
+        clean_build(full=args.clean)
+        
+        # Build executable
+        if not build_executable():
+            print("\nBuild failed.")
+            return 1
+        
+        # Create distribution
+        create_distribution()
+        
+        BUILD_HASH_FILE.write_text(build_hash)
     
     # Verify build
     if not verify_build():
         print("\nVerification failed.")
         return 1
     
-    # Create distribution
-    create_distribution()
-    
     print("\n" + "=" * 60)
     print("BUILD COMPLETE")
     print("=" * 60)
-    print("\nExecutable: dist/PyDebFlow.exe")
+    print(f"\nExecutable: {EXE_PATH}")
     print("\nTo run the GUI:")
     print("  dist\\PyDebFlow.exe")
     print("\nTo run CLI:")
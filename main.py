@@ -9,8 +9,12 @@ Main entry point for the GUI application.
 import sys
 from pathlib import Path
 
-# Add src to path
-sys.path.insert(0, str(Path(__file__).parent))
+# Project root (constant for the lifetime of the process)
+_HERE = Path(__file__).resolve().parent
+
+# Add src to path (once: pydebflow.py may already have added it)
+if str(_HERE) not in sys.path:
+    sys.path.insert(0, str(_HERE))
 
 
 def main():
@@ -20,10 +20,35 @@ Installation:
 
 import sys
 import argparse
+import functools
+import importlib.util
+from importlib import metadata
 from pathlib import Path
 
-# Ensure src is in path
-sys.path.insert(0, str(Path(__file__).parent))
+# Project root (constant for the lifetime of the process)
+_HERE = Path(__file__).resolve().parent
+
+# Commands that import from the project tree (run_simulation, main, src)
+_NEEDS_SRC = frozenset({'simulate', 'gui', 'test'})
+
+# (display name, import name) of dependencies reported by `pydebflow info`
+_DEPENDENCIES = (
+    ('numpy', 'numpy'),
+    ('numba', 'numba'),
+    ('scipy', 'scipy'),
+    ('matplotlib', 'matplotlib'),
+    ('PyQt6', 'PyQt6'),
+    ('pyvista', 'pyvista'),
+    ('rasterio', 'rasterio'),
+)
+
+
+@functools.lru_cache(maxsize=1)
+def _get_platform():
+    """Return (python version, system, release, machine) for this process."""
+    import platform
+    return (platform.python_version(), platform.system(),
+            platform.release(), platform.machine())
 
 
 def cmd_simulate(args):
@@ -77,50 +102,43 @@ def cmd_test(args):
         from run_simulation import test_all
         test_all()
     elif args.module:
-        import subprocess
-        subprocess.run([sys.executable, "-m", "pytest", f"tests/test_{args.module}.py", "-v"])
+        import pytest
+        sys.exit(pytest.main([f"tests/test_{args.module}.py", "-v"]))
     else:
-        import subprocess
-        subprocess.run([sys.executable, "-m", "pytest", "tests/", "-v"])
+        import pytest
+        sys.exit(pytest.main(["tests/", "-v"]))
 
 
 def cmd_info(args):
     """Display system and version information."""
-    import platform
+    python_version, system, release, machine = _get_platform()
     
     print("=" * 66)
     print("               PyDebFlow Information")
     print("=" * 66)
     print()
     print("Version:      0.1.0")
-    print(f"Python:       {platform.python_version()}")
-    print(f"Platform:     {platform.system()} {platform.release()}")
-    print(f"Architecture: {platform.machine()}")
+    print(f"Python:       {python_version}")
+    print(f"Platform:     {system} {release}")
+    print(f"Architecture: {machine}")
     print()
     
     # Check dependencies
     print("Dependencies:")
-    deps = [
-        ('numpy', 'numpy'),
-        ('numba', 'numba'),
-        ('scipy', 'scipy'),
-        ('matplotlib', 'matplotlib'),
-        ('PyQt6', 'PyQt6'),
-        ('pyvista', 'pyvista'),
-        ('rasterio', 'rasterio'),
-    ]
-    
-    for name, module in deps:
-        try:
-            mod = __import__(module)
-            version = getattr(mod, '__version__', 'installed')
-            print(f"  {name:12s} {version}")
-        except ImportError:
+    # Read versions from package metadata instead of importing each package
+    for name, module in _DEPENDENCIES:
+        if importlib.util.find_spec(module) is None:
             print(f"  {name:12s} NOT INSTALLED")
+            continue
+        try:
+            version = metadata.version(name)
+        except metadata.PackageNotFoundError:
+            version = 'installed'
+        print(f"  {name:12s} {version}")
     
     print()
     print("Project Location:")
-    print(f"  {Path(__file__).parent.resolve()}")
+    print(f"  {_HERE}")
 
 
 def cmd_version(args):
@@ -128,29 +146,8 @@ def cmd_version(args):
     print("PyDebFlow version 0.1.0")
 
 
-def main():
-    """Main CLI entry point."""
-    parser = argparse.ArgumentParser(
-        prog='pydebflow',
-        description='PyDebFlow - Advanced Two-Phase Mass Flow Simulation',
-        epilog='Run "pydebflow <command> --help" for command-specific help',
-        formatter_class=argparse.RawDescriptionHelpFormatter
-    )
-    
-    parser.add_argument('--version', '-V', action='store_true',
-                        help='Show version and exit')
-    
-    subparsers = parser.add_subparsers(dest='command', title='Commands')
-    
-    # =====================================================================
-    # simulate command
-    # =====================================================================
-    sim_parser = subparsers.add_parser(
-        'simulate', 
-        help='Run a debris flow simulation',
-        description='Run simulation on synthetic terrain or a DEM file'
-    )
-    
+def _add_simulate_args(sim_parser):
+    """Add the arguments of the ``simulate`` command."""
     sim_input = sim_parser.add_argument_group('Input')
     sim_input.add_argument('--dem', '-d', type=str, metavar='FILE',
                            help='Path to DEM file (GeoTIFF or ASCII Grid)')
@@ -183,45 +180,74 @@ def main():
                          help='Export animation to MP4 video')
     sim_viz.add_argument('--no-viz', action='store_true',
                          help='Disable all visualization')
-    
-    sim_parser.set_defaults(func=cmd_simulate)
-    
-    # =====================================================================
-    # gui command
-    # =====================================================================
-    gui_parser = subparsers.add_parser(
-        'gui',
-        help='Launch the graphical user interface',
-        description='Open the PyDebFlow desktop application'
-    )
-    gui_parser.set_defaults(func=cmd_gui)
-    
-    # =====================================================================
-    # test command
-    # =====================================================================
-    test_parser = subparsers.add_parser(
-        'test',
-        help='Run tests',
-        description='Run unit tests and integration tests'
-    )
+
+
+def _add_test_args(test_parser):
+    """Add the arguments of the ``test`` command."""
     test_parser.add_argument('--all', '-a', action='store_true',
                               help='Run all built-in component tests')
     test_parser.add_argument('--module', '-m', type=str,
                               help='Run specific test module (e.g., rheology, solver)')
-    test_parser.set_defaults(func=cmd_test)
-    
-    # =====================================================================
-    # info command
-    # =====================================================================
-    info_parser = subparsers.add_parser(
-        'info',
-        help='Display system information',
-        description='Show version, dependencies, and system info'
+
+
+# name -> (help, description, argument builder, handler)
+_COMMANDS = {
+    'simulate': (
+        'Run a debris flow simulation',
+        'Run simulation on synthetic terrain or a DEM file',
+        _add_simulate_args,
+        cmd_simulate,
+    ),
+    'gui': (
+        'Launch the graphical user interface',
+        'Open the PyDebFlow desktop application',
+        None,
+        cmd_gui,
+    ),
+    'test': (
+        'Run tests',
+        'Run unit tests and integration tests',
+        _add_test_args,
+        cmd_test,
+    ),
+    'info': (
+        'Display system information',
+        'Show version, dependencies, and system info',
+        None,
+        cmd_info,
+    ),
+}
+
+
+def main(argv=None):
+    """Main CLI entry point."""
+    if argv is None:
+        argv = sys.argv[1:]
+    
+    parser = argparse.ArgumentParser(
+        prog='pydebflow',
+        description='PyDebFlow - Advanced Two-Phase Mass Flow Simulation',
+        epilog='Run "pydebflow <command> --help" for command-specific help',
+        formatter_class=argparse.RawDescriptionHelpFormatter
     )
-    info_parser.set_defaults(func=cmd_info)
+    
+    parser.add_argument('--version', '-V', action='store_true',
+                        help='Show version and exit')
+    
+    subparsers = parser.add_subparsers(dest='command', title='Commands')
+    
+    # The only top-level option is a flag, so the first positional token
+    # names the command. Only that command's arguments are constructed.
+    selected = next((arg for arg in argv if not arg.startswith('-')), None)
+    
+    for name, (help_text, description, add_arguments, func) in _COMMANDS.items():
+        sub_parser = subparsers.add_parser(name, help=help_text, description=description)
+        if add_arguments is not None and name == selected:
+            add_arguments(sub_parser)
+        sub_parser.set_defaults(func=func)
     
     # Parse and execute
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
     
     if args.version:
         cmd_version(args)
@@ -236,6 +262,10 @@ def main():
         print("  pydebflow info                    # System info")
         return
     
+    # Ensure src is in path
+    if args.command in _NEEDS_SRC and str(_HERE) not in sys.path:
+        sys.path.insert(0, str(_HERE))
+    
     # Execute command
     args.func(args)
 
@@ -0,0 +1,101 @@
+# -*- mode: python ; coding: utf-8 -*-
+"""
+PyInstaller spec for PyDebFlow.
+
+Build with:
+    python build_script.py
+    OR
+    python -m PyInstaller pydebflow.spec --noconfirm
+
+Keeping the build declarative lets PyInstaller reuse the analysis cache
+in build/ between runs instead of re-walking the dependency graph.
+"""
+
+import importlib.util
+import sys
+from importlib import metadata
+from pathlib import Path
+
+from packaging.version import Version
+from PyInstaller.utils.hooks import collect_data_files, collect_submodules
+
+
+def detect_hidden_imports():
+    """Return every module under src/ as a dotted import name."""
+    root = Path(SPECPATH)
+    modules = []
+    for path in sorted((root / 'src').rglob('*.py')):
+        parts = path.relative_to(root).with_suffix('').parts
+        if parts[-1] == '__init__':
+            parts = parts[:-1]
+        modules.append('.'.join(parts))
+    return modules
+
+
+# scipy/numpy load several submodules dynamically; collect them up front
+# rather than maintaining a hand-written list
+hiddenimports = (
+    ['matplotlib.backends.backend_qtagg', 'numpy.f2py']
+    + collect_submodules('scipy', filter=lambda name: '.tests' not in name)
+    + detect_hidden_imports()
+)
+datas = [('src', 'src')] + collect_data_files('scipy') + collect_data_files('matplotlib')
+
+# Optional packages are located without importing them (importing PyQt6
+# alone would load the Qt libraries into the build process)
+if importlib.util.find_spec('PyQt6') is not None:
+    hiddenimports += [
+        'PyQt6',
+        'PyQt6.QtWidgets',
+        'PyQt6.QtCore',
+        'PyQt6.QtGui',
+    ]
+    windowed = True
+else:
+    print("  Note: PyQt6 not found, building CLI-only version")
+    windowed = False
+
+if importlib.util.find_spec('numba') is not None:
+    hiddenimports.append('numba')
+    # numba 0.61+ imports the numba.core.*.old_* modules lazily; filter
+    # afterwards since collect_submodules' filter also prunes packages
+    if Version(metadata.version('numba')) >= Version('0.61'):
+        hiddenimports += [
+            name for name in collect_submodules('numba') if '.old_' in name
+        ]
+
+
+a = Analysis(
+    ['main.py'],
+    pathex=['.'],
+    datas=datas,
+    hiddenimports=hiddenimports,
+    # Exclude unnecessary packages to reduce size
+    excludes=['tkinter', 'test', 'unittest'],
+    noarchive=False,
+    # Bundle bytecode compiled as with `python -OO` (no docstrings/asserts)
+    optimize=2,
+)
+
+pyz = PYZ(a.pure)
+
+exe = EXE(
+    pyz,
+    a.scripts,
+    a.binaries,
+    a.datas,
+    [],
+    name='PyDebFlow',
+    debug=False,
+    # Strip debug symbols from bundled libraries (Linux only: Windows has no
+    # strip tool and stripping breaks code signatures on macOS)
+    strip=sys.platform.startswith('linux'),
+    # Compress with UPX when it is on PATH (silently skipped otherwise)
+    upx=True,
+    upx_exclude=[
+        'vcruntime140.dll',
+        'python3.dll',
+        f'python3{sys.version_info.minor}.dll',
+    ],
+    console=not windowed,
+)
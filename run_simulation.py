@@ -12,20 +12,63 @@ Run with --help for usage information.
 import sys
 import os
 import argparse
+import shutil
+import tempfile
+import time
 import numpy as np
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
-# Add src to path if running directly
-sys.path.insert(0, str(Path(__file__).parent))
+# Add src to path if running directly (once: pydebflow.py may already have added it)
+_HERE = Path(__file__).resolve().parent
+if str(_HERE) not in sys.path:
+    sys.path.insert(0, str(_HERE))
 
 from src.core.terrain import Terrain
-from src.core.flow_model import TwoPhaseFlowModel, FlowState, FlowParameters
+from src.core.flow_model import (
+    TwoPhaseFlowModel, FlowState, FlowParameters,
+    first_active_row, total_volume, update_maxima,
+)
 from src.core.noc_tvd_solver import NOCTVDSolver, SolverConfig
 from src.physics.rheology import MohrCoulomb, Voellmy
 from src.physics.entrainment import EntrainmentModel
 from src.io.parameters import SimulationParameters
 from src.io.results import ResultsExporter, SimulationResults
-from src.visualization.plot_utils import FlowVisualizer
+
+
+# Post-processing stops folding frames into the hazard maps once the peak
+# speed stays below REST_SPEED (m/s) with no peak-height growth for more
+# than REST_FRAMES consecutive output frames
+REST_SPEED = 1e-3
+REST_FRAMES = 5
+
+
+def make_progress_bar(interval: float = 0.1):
+    """
+    Create a solver progress callback drawing a console progress bar.
+    
+    Redraws are throttled to one per `interval` seconds so that fast solvers
+    are not slowed down by terminal writes; the final tick (progress >= 1,
+    sent by the solver when the run ends) is always drawn.
+    """
+    last_draw = -interval
+    
+    def progress_callback(progress, t, step):
+        nonlocal last_draw
+        now = time.monotonic()
+        if now - last_draw < interval and progress < 1.0:
+            return
+        last_draw = now
+        
+        bar_len = 50
+        filled = int(bar_len * progress)
+        bar = '█' * filled + '░' * (bar_len - filled)
+        # Flush explicitly: the bar has no newline, so line buffering
+        # would otherwise hold it back
+        print(f"\r  [{bar}] {progress*100:5.1f}% | t={t:6.1f}s | step={step:5d}", 
+              end='', flush=True)
+    
+    return progress_callback
 
 
 def run_synthetic_test(output_dir: str = "./test_output", 
@@ -52,8 +95,11 @@ def run_synthetic_test(output_dir: str = "./test_output",
         slope_angle=25.0,
         add_channel=True
     )
-    print(f"  Grid: {terrain.rows} x {terrain.cols} cells")
-    print(f"  Cell size: {terrain.cell_size} m")
+    rows, cols = terrain.rows, terrain.cols
+    cs = terrain.cell_size
+    cs2 = cs * cs
+    print(f"  Grid: {rows} x {cols} cells")
+    print(f"  Cell size: {cs} m")
     print(f"  Elevation range: {terrain.elevation.min():.1f} to {terrain.elevation.max():.1f} m")
     
     # Set up flow model
@@ -81,8 +127,6 @@ def run_synthetic_test(output_dir: str = "./test_output",
     
     # Initialize release zone
     print("\n[3/5] Creating release zone...")
-    state = FlowState.zeros((terrain.rows, terrain.cols))
-    
     release = terrain.create_release_zone(
         center_i=15,
         center_j=30,
@@ -90,10 +134,9 @@ def run_synthetic_test(output_dir: str = "./test_output",
         height=5.0
     )
     
-    state.h_solid = release * 0.7
-    state.h_fluid = release * 0.3
+    state = FlowState.from_release(release, solid_frac=0.7)
     
-    initial_volume = (state.h_solid.sum() + state.h_fluid.sum()) * terrain.cell_size**2
+    initial_volume = release.sum() * cs2
     print(f"  Release center: ({15}, {30})")
     print(f"  Release radius: 8 cells")
     print(f"  Max height: {release.max():.1f} m")
@@ -103,42 +146,40 @@ def run_synthetic_test(output_dir: str = "./test_output",
     # Run simulation
     print(f"\n[4/5] Running simulation (t_end = {t_end}s)...")
     
-    def progress_callback(progress, time, step):
-        bar_len = 50
-        filled = int(bar_len * progress)
-        bar = '█' * filled + '░' * (bar_len - filled)
-        print(f"\r  [{bar}] {progress*100:5.1f}% | t={time:6.1f}s | step={step:5d}", 
-              end='', flush=True)
-    
     outputs = solver.run_simulation(
         state,
         t_end=t_end,
         output_interval=1.0,
-        progress_callback=progress_callback
+        progress_callback=make_progress_bar()
     )
+    times, states = zip(*outputs)
+    times = np.asarray(times)
     print("\n  Simulation complete!")
     
     # Process results
     print("\n[5/5] Processing and exporting results...")
     
-    max_height = np.zeros((terrain.rows, terrain.cols))
-    max_velocity = np.zeros((terrain.rows, terrain.cols))
-    max_pressure = np.zeros((terrain.rows, terrain.cols))
+    max_height = np.zeros((rows, cols), dtype=np.float32)
+    max_velocity = np.zeros((rows, cols), dtype=np.float32)
+    max_pressure = np.zeros((rows, cols), dtype=np.float32)
     
-    for t, s in outputs:
-        h_total = s.h_solid + s.h_fluid
-        speed = np.sqrt(s.u_solid**2 + s.v_solid**2)
-        pressure = model.compute_impact_pressure(s)
+    quiet_frames = 0
+    for s in states:
+        grown, peak_speed = update_maxima(s.h_solid, s.h_fluid,
+                                          s.u_solid, s.v_solid, s.u_fluid, s.v_fluid,
+                                          params.solid_density, params.fluid_density,
+                                          max_height, max_velocity, max_pressure)
         
-        max_height = np.maximum(max_height, h_total)
-        max_velocity = np.maximum(max_velocity, speed)
-        max_pressure = np.maximum(max_pressure, pressure)
+        # Once the flow is at rest later frames cannot raise the maxima
+        quiet_frames = 0 if grown else quiet_frames + 1
+        if peak_speed < REST_SPEED and quiet_frames > REST_FRAMES:
+            break
     
-    _, final_state = outputs[-1]
+    final_state = states[-1]
     
     # Export
     results = SimulationResults(
-        times=[t for t, _ in outputs],
+        times=times,
         max_flow_height=max_height,
         max_velocity=max_velocity,
         max_pressure=max_pressure,
@@ -149,7 +190,7 @@ def run_synthetic_test(output_dir: str = "./test_output",
     )
     
     metadata = {
-        'cell_size': terrain.cell_size,
+        'cell_size': cs,
         'x_origin': terrain.x_origin,
         'y_origin': terrain.y_origin
     }
@@ -167,30 +208,31 @@ def run_synthetic_test(output_dir: str = "./test_output",
     print("SIMULATION RESULTS")
     print("=" * 70)
     
-    final_volume = (final_state.h_solid.sum() + final_state.h_fluid.sum()) * terrain.cell_size**2
-    affected_area = np.sum(max_height > 0.1) * terrain.cell_size**2
-    runout = np.argmax(max_height.sum(axis=1) > 0)
+    final_volume = total_volume(final_state.h_solid, final_state.h_fluid) * cs2
+    affected_area = np.sum(max_height > 0.1) * cs2
+    runout = first_active_row(max_height)
     
     print(f"  Simulation time:    {t_end} s")
-    print(f"  Time steps:         {len(outputs)}")
+    print(f"  Time steps:         {len(states)}")
     print(f"  Max flow height:    {max_height.max():.2f} m")
     print(f"  Max velocity:       {max_velocity.max():.2f} m/s")
     print(f"  Max impact pressure:{max_pressure.max():.1f} kPa")
     print(f"  Initial volume:     {initial_volume:.0f} m³")
     print(f"  Final volume:       {final_volume:.0f} m³")
     print(f"  Affected area:      {affected_area:.0f} m²")
-    print(f"  Approximate runout: {runout * terrain.cell_size:.0f} m")
+    print(f"  Approximate runout: {runout * cs:.0f} m")
     
     # Visualization
     if visualize:
         print("\nGenerating visualization...")
         import matplotlib.pyplot as plt
+        from src.visualization.plot_utils import FlowVisualizer
         
         viz = FlowVisualizer()
         
         fig = viz.plot_results_summary(
             max_height, max_velocity, max_pressure, terrain.elevation,
-            cell_size=terrain.cell_size,
+            cell_size=cs,
             title=f"PyDebFlow Synthetic Test (t={t_end}s)"
         )
         
@@ -296,8 +338,11 @@ def run_dem_simulation(dem_file: str,
     # Load DEM
     print(f"\n[1/6] Loading DEM: {dem_file}")
     terrain = Terrain.load(dem_file)
-    print(f"  Grid: {terrain.rows} x {terrain.cols} cells")
-    print(f"  Cell size: {terrain.cell_size} m")
+    rows, cols = terrain.rows, terrain.cols
+    cs = terrain.cell_size
+    cs2 = cs * cs
+    print(f"  Grid: {rows} x {cols} cells")
+    print(f"  Cell size: {cs} m")
     print(f"  Elevation range: {terrain.elevation.min():.1f} to {terrain.elevation.max():.1f} m")
     
     # Setup model
@@ -316,7 +361,6 @@ def run_dem_simulation(dem_file: str,
     
     # Initialize release
     print(f"\n[3/6] Creating release zone...")
-    state = FlowState.zeros((terrain.rows, terrain.cols))
     
     if release_vertices is not None and len(release_vertices) >= 3:
         # Polygon release zone
@@ -329,104 +373,131 @@ def run_dem_simulation(dem_file: str,
     else:
         # Circular release zone (original behavior)
         if release_i is None:
-            release_i = terrain.rows // 5
+            release_i = rows // 5
         if release_j is None:
-            release_j = terrain.cols // 2
+            release_j = cols // 2
         release = terrain.create_release_zone(release_i, release_j, release_radius, release_height)
         print(f"  Circular release at ({release_i}, {release_j}), radius={release_radius}")
     
-    state.h_solid = release * 0.7
-    state.h_fluid = release * 0.3
+    state = FlowState.from_release(release, solid_frac=0.7)
     
-    initial_volume = (state.h_solid.sum() + state.h_fluid.sum()) * terrain.cell_size**2
+    initial_volume = release.sum() * cs2
     print(f"  Initial volume: {initial_volume:.0f} m³")
     
     # Run simulation with snapshot collection
     print(f"\n[4/6] Running simulation (t_end = {t_end}s)...")
     
-    def progress_callback(progress, time, step):
-        bar_len = 50
-        filled = int(bar_len * progress)
-        bar = '█' * filled + '░' * (bar_len - filled)
-        print(f"\r  [{bar}] {progress*100:5.1f}% | t={time:6.1f}s | step={step:5d}", 
-              end='', flush=True)
-    
     outputs = solver.run_simulation(
         state,
         t_end=t_end,
         output_interval=max(1.0, t_end / 60),  # ~60 frames max
-        progress_callback=progress_callback
+        progress_callback=make_progress_bar()
     )
+    times, states = zip(*outputs)
+    times = np.asarray(times)
     print("\n  Simulation complete!")
     
     # Process results
     print("\n[5/6] Processing results...")
-    max_height = np.zeros((terrain.rows, terrain.cols))
-    max_velocity = np.zeros((terrain.rows, terrain.cols))
-    max_pressure = np.zeros((terrain.rows, terrain.cols))
-    snapshots = []
-    times = []
-    
-    for t, s in outputs:
-        h_total = s.h_solid + s.h_fluid
-        speed = np.sqrt(s.u_solid**2 + s.v_solid**2)
-        pressure = model.compute_impact_pressure(s)
-        
-        max_height = np.maximum(max_height, h_total)
-        max_velocity = np.maximum(max_velocity, speed)
-        max_pressure = np.maximum(max_pressure, pressure)
-        
-        snapshots.append(h_total.copy())
-        times.append(t)
-    
-    _, final_state = outputs[-1]
-    
-    # Export
+    max_height = np.zeros((rows, cols), dtype=np.float32)
+    max_velocity = np.zeros((rows, cols), dtype=np.float32)
+    max_pressure = np.zeros((rows, cols), dtype=np.float32)
     Path(output_dir).mkdir(parents=True, exist_ok=True)
-    results = SimulationResults(
-        times=times,
-        max_flow_height=max_height,
-        max_velocity=max_velocity,
-        max_pressure=max_pressure,
-        final_h_solid=final_state.h_solid,
-        final_h_fluid=final_state.h_fluid,
-        final_u=final_state.u_solid,
-        final_v=final_state.v_solid
-    )
     
-    metadata = {
-        'cell_size': terrain.cell_size,
-        'x_origin': terrain.x_origin,
-        'y_origin': terrain.y_origin
-    }
-    exporter = ResultsExporter(output_dir, metadata)
-    exported = exporter.export_results(results, format='npy')
-    
-    print(f"  Results saved to: {output_dir}")
-    
-    # 3D Animation
-    print("\n[6/6] 3D Visualization...")
+    # Animation frames are only kept for the 3D viewer. They go to a
+    # disk-backed scratch .npy so large DEMs page out instead of exhausting
+    # RAM; it lives next to the results rather than in the system temp
+    # directory, which may itself be RAM-backed
+    snapshots = None
+    viewer = None
     if animate_3d or export_video:
-        try:
-            from src.visualization.dem_viewer import DEMViewer3D
+        scratch_dir = tempfile.mkdtemp(prefix='.pydebflow_frames_', dir=output_dir)
+        snapshots = np.lib.format.open_memmap(
+            Path(scratch_dir) / 'snapshots.npy', mode='w+',
+            dtype=np.float32, shape=(len(states), rows, cols)
+        )
+    
+    try:
+        quiet_frames = 0
+        at_rest = False
+        for k, s in enumerate(states):
+            if at_rest:
+                if snapshots is None:
+                    break
+                # Maxima are settled; only the animation frame is still needed
+                np.add(s.h_solid, s.h_fluid, out=snapshots[k])
+                continue
             
-            viewer = DEMViewer3D(terrain.elevation, terrain.cell_size)
-            viewer.load_snapshots(snapshots, times)
+            frame = None if snapshots is None else snapshots[k]
+            grown, peak_speed = update_maxima(s.h_solid, s.h_fluid,
+                                              s.u_solid, s.v_solid, s.u_fluid, s.v_fluid,
+                                              params.solid_density, params.fluid_density,
+                                              max_height, max_velocity, max_pressure,
+                                              h_total_out=frame)
             
-            if export_video:
-                # Ensure output directory exists
-                Path(output_dir).mkdir(parents=True, exist_ok=True)
-                video_path = Path(output_dir).resolve() / 'debris_flow.mp4'
-                # Use forward slashes for ffmpeg compatibility on Windows
-                viewer.export_animation(str(video_path).replace('\\', '/'))
+            quiet_frames = 0 if grown else quiet_frames + 1
+            at_rest = peak_speed < REST_SPEED and quiet_frames > REST_FRAMES
+        
+        final_state = states[-1]
+        
+        # Export
+        results = SimulationResults(
+            times=times,
+            max_flow_height=max_height,
+            max_velocity=max_velocity,
+            max_pressure=max_pressure,
+            final_h_solid=final_state.h_solid,
+            final_h_fluid=final_state.h_fluid,
+            final_u=final_state.u_solid,
+            final_v=final_state.v_solid
+        )
+        
+        metadata = {
+            'cell_size': cs,
+            'x_origin': terrain.x_origin,
+            'y_origin': terrain.y_origin
+        }
+        exporter = ResultsExporter(output_dir, metadata)
+        
+        # Results are written in the background while PyVista loads and the
+        # video is rendered
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            export_job = pool.submit(exporter.export_results, results, format='npy')
             
-            if animate_3d:
-                print("  Opening 3D viewer...")
-                viewer.show_static(max_height, f"PyDebFlow - {Path(dem_file).stem}")
+            # 3D Animation
+            print("\n[6/6] 3D Visualization...")
+            if snapshots is not None:
+                try:
+                    import pyvista  # noqa: F401 - loaded here to overlap the export
+                    from src.visualization.dem_viewer import DEMViewer3D
+                    
+                    viewer = DEMViewer3D(terrain.elevation, cs)
+                    viewer.load_snapshots(list(snapshots), times)
+                    
+                    if export_video:
+                        video_path = Path(output_dir).resolve() / 'debris_flow.mp4'
+                        # Use forward slashes for ffmpeg compatibility on Windows
+                        viewer.export_animation(str(video_path).replace('\\', '/'))
                 
-        except ImportError as e:
-            print(f"  ⚠ 3D visualization unavailable: {e}")
-            print("    Install PyVista: pip install pyvista")
+                except ImportError as e:
+                    viewer = None
+                    print(f"  ⚠ 3D visualization unavailable: {e}")
+                    print("    Install PyVista: pip install pyvista")
+            
+            # Finish the export before the blocking interactive window opens
+            exported = export_job.result()
+        
+        print(f"  Results saved to: {output_dir}")
+        
+        if animate_3d and viewer is not None:
+            print("  Opening 3D viewer...")
+            viewer.show_static(max_height, f"PyDebFlow - {Path(dem_file).stem}")
+    finally:
+        if snapshots is not None:
+            # Drop every view of the memory map before deleting it; removal
+            # errors are ignored (Windows refuses while a view is mapped)
+            del viewer, snapshots
+            shutil.rmtree(scratch_dir, ignore_errors=True)
     
     print("\n✓ DEM simulation complete!")
 
@@ -46,7 +46,6 @@ goto :eof
 echo [INFO] Cleaning build artifacts...
 if exist "build" rmdir /s /q "build"
 if exist "dist" rmdir /s /q "dist"
-if exist "*.spec" del /q "*.spec"
 echo       [OK] Clean complete
 echo.
 if "%~2"=="" goto :eof
@@ -56,7 +55,7 @@ echo [1/3] Checking PyInstaller...
 python -c "import PyInstaller" 2>nul
 if errorlevel 1 (
     echo       Installing PyInstaller...
-    pip install pyinstaller
+    pip install --no-compile pyinstaller
 )
 echo       [OK] PyInstaller ready
 echo.
@@ -85,7 +85,7 @@ done
 # Clean if requested
 if [ "$CLEAN" = true ]; then
     echo -e "${YELLOW}Cleaning build artifacts...${NC}"
-    rm -rf build/ dist/ *.spec
+    rm -rf build/ dist/
     echo -e "${GREEN}   ✓ Clean complete${NC}"
     echo
 fi
@@ -94,7 +94,7 @@ fi
 echo -e "${YELLOW}[1/3] Checking PyInstaller...${NC}"
 if ! python -c "import PyInstaller" 2>/dev/null; then
     echo -e "   Installing PyInstaller..."
-    pip install pyinstaller
+    pip install --no-compile pyinstaller
 fi
 echo -e "${GREEN}   ✓ PyInstaller ready${NC}"
 
@@ -34,15 +34,25 @@ from .physics.entrainment import EntrainmentModel
 from .io.parameters import SimulationParameters
 from .io.results import SimulationResults, ResultsExporter
 
-# Visualization (optional - may not be installed)
-try:
-    from .visualization.dem_viewer import DEMViewer3D
-    from .visualization.plot_utils import FlowVisualizer
-    _HAS_VISUALIZATION = True
-except ImportError:
-    _HAS_VISUALIZATION = False
-    DEMViewer3D = None
-    FlowVisualizer = None
+# Visualization (optional - may not be installed). Imported on first access
+# so the core API does not pay for loading matplotlib.
+_VISUALIZATION_MODULES = {
+    "DEMViewer3D": ".visualization.dem_viewer",
+    "FlowVisualizer": ".visualization.plot_utils",
+}
+
+
+def __getattr__(name):
+    if name in _VISUALIZATION_MODULES:
+        import importlib
+        try:
+            module = importlib.import_module(_VISUALIZATION_MODULES[name], __name__)
+            value = getattr(module, name)
+        except ImportError:
+            value = None
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 # Public API
 __all__ = [
@@ -84,7 +94,9 @@ def main():
     from pathlib import Path
     
     # Add parent to path for pydebflow.py
-    sys.path.insert(0, str(Path(__file__).parent.parent))
+    root = str(Path(__file__).resolve().parent.parent)
+    if root not in sys.path:
+        sys.path.insert(0, root)
     
     try:
         from pydebflow import main as cli_main
@@ -102,4 +114,4 @@ def get_version():
 
 def has_visualization():
     """Check if visualization dependencies are installed."""
-    return _HAS_VISUALIZATION
+    return all(__getattr__(name) is not None for name in _VISUALIZATION_MODULES)
@@ -5,10 +5,11 @@ Implements the governing equations for solid-fluid two-phase debris flows
 based on Pudasaini (2012) two-phase model.
 """
 
+import math
 import numpy as np
 from dataclasses import dataclass, field
 from typing import Tuple, Optional
-from numba import njit
+from numba import njit, prange
 
 
 @dataclass
@@ -80,6 +81,26 @@ class FlowState:
             v_fluid=np.zeros(shape, dtype=np.float64),
         )
     
+    @classmethod
+    def from_release(cls, release: np.ndarray,
+                     solid_frac: float = 0.7) -> 'FlowState':
+        """
+        Create a flow state at rest from a release-depth grid.
+        
+        Args:
+            release: Initial total flow height (m)
+            solid_frac: Share of the release depth assigned to the solid phase
+        """
+        shape = release.shape
+        return cls(
+            h_solid=np.multiply(release, solid_frac, dtype=np.float64),
+            h_fluid=np.multiply(release, 1.0 - solid_frac, dtype=np.float64),
+            u_solid=np.zeros(shape, dtype=np.float64),
+            v_solid=np.zeros(shape, dtype=np.float64),
+            u_fluid=np.zeros(shape, dtype=np.float64),
+            v_fluid=np.zeros(shape, dtype=np.float64),
+        )
+    
     @property
     def h_total(self) -> np.ndarray:
         """Total flow height."""
@@ -309,6 +330,114 @@ class TwoPhaseFlowModel:
         return flux_mass_solid, flux_mass_fluid, flux_mom_solid, flux_mom_fluid
 
 
+@njit(inline='always')
+def _impact_pressure(h_solid: float, h_fluid: float, u: float, v: float,
+                     rho_solid: float, rho_fluid: float) -> float:
+    """Impact pressure (kPa) of one cell, as in TwoPhaseFlowModel.compute_impact_pressure."""
+    h_total = h_solid + h_fluid
+    
+    # Mixture density from solid fraction
+    alpha = h_solid / h_total if h_total > 1e-6 else 0.5
+    alpha = min(max(alpha, 0.0), 1.0)
+    rho = alpha * rho_solid + (1.0 - alpha) * rho_fluid
+    
+    return 0.5 * rho * (u * u + v * v) / 1000.0
+
+
+@njit(cache=True, parallel=True, fastmath=True)
+def update_maxima(h_solid: np.ndarray, h_fluid: np.ndarray,
+                  u_solid: np.ndarray, v_solid: np.ndarray,
+                  u_fluid: np.ndarray, v_fluid: np.ndarray,
+                  rho_solid: float, rho_fluid: float,
+                  max_height: np.ndarray, max_velocity: np.ndarray,
+                  max_pressure: np.ndarray,
+                  h_total_out: Optional[np.ndarray] = None) -> Tuple[int, float]:
+    """
+    Fold one output frame into the running hazard maps, in place.
+    
+    Total height, solid speed and impact pressure (same formula as
+    TwoPhaseFlowModel.compute_impact_pressure) are computed and compared
+    against the maxima in a single pass over the grid. If h_total_out is
+    given, the total height of the frame is also stored there (e.g. a slot
+    of a float32 animation buffer), so it is not summed a second time.
+    
+    Returns the number of cells whose peak height grew and the frame's
+    largest speed of either phase, which callers use to detect a flow at
+    rest (the fluid can keep moving after the solid has stopped).
+    
+    Each cell is read once and all three maxima are updated while its
+    values are in registers, so there is no reuse between separate
+    reductions for cache tiling to recover; rows are streamed in order,
+    which the hardware prefetcher already handles well.
+    """
+    rows, cols = h_solid.shape
+    grown = 0
+    peak_speed = 0.0
+    
+    for i in prange(rows):
+        for j in range(cols):
+            ht = h_solid[i, j] + h_fluid[i, j]
+            us = u_solid[i, j]
+            vs = v_solid[i, j]
+            uf = u_fluid[i, j]
+            vf = v_fluid[i, j]
+            speed = math.sqrt(us * us + vs * vs)
+            pressure = _impact_pressure(h_solid[i, j], h_fluid[i, j],
+                                        us, vs, rho_solid, rho_fluid)
+            
+            peak_speed = max(peak_speed, max(speed, math.sqrt(uf * uf + vf * vf)))
+            
+            if ht > max_height[i, j]:
+                previous = max_height[i, j]
+                max_height[i, j] = ht
+                # Compare after the store: a float32 map may round ht back
+                # down to the value it already holds
+                if max_height[i, j] > previous:
+                    grown += 1
+            if speed > max_velocity[i, j]:
+                max_velocity[i, j] = speed
+            if pressure > max_pressure[i, j]:
+                max_pressure[i, j] = pressure
+            if h_total_out is not None:
+                h_total_out[i, j] = ht
+    
+    return grown, peak_speed
+
+
+@njit(cache=True, parallel=True, fastmath=True)
+def total_volume(h_solid: np.ndarray, h_fluid: np.ndarray) -> float:
+    """
+    Sum of solid and fluid depth over the grid (multiply by cell area for m³).
+    
+    Both phases are read in one pass instead of two separate reductions.
+    """
+    rows, cols = h_solid.shape
+    total = 0.0
+    
+    for i in prange(rows):
+        for j in range(cols):
+            total += h_solid[i, j] + h_fluid[i, j]
+    
+    return total
+
+
+@njit(cache=True)
+def first_active_row(field: np.ndarray) -> int:
+    """
+    Index of the first row holding a positive value (0 if there is none).
+    
+    Stops at the first hit instead of reducing the whole grid.
+    """
+    rows, cols = field.shape
+    
+    for i in range(rows):
+        for j in range(cols):
+            if field[i, j] > 0.0:
+                return i
+    
+    return 0
+
+
 def test_flow_model():
     """Test flow model functionality."""
     print("=" * 50)
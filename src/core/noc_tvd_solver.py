@@ -373,7 +373,8 @@ class NOCTVDSolver:
             initial_state: Initial flow conditions
             t_end: End time (seconds)
             output_interval: Time interval for saving outputs
-            progress_callback: Optional callback(progress, time, step)
+            progress_callback: Optional callback(progress, time, step),
+                called every 10 steps and once when the run ends
             
         Returns:
             List of (time, state) tuples at output intervals
@@ -416,6 +417,10 @@ class NOCTVDSolver:
         if outputs[-1][0] < t:
             outputs.append((t, state.copy()))
         
+        # Always report the finished run, whatever the step count
+        if progress_callback:
+            progress_callback(t / t_end if t_end > 0 else 1.0, t, step)
+        
         elapsed = time.time() - start_time
         print(f"\n  Simulation completed in {elapsed:.1f}s ({step} steps)")
         
@@ -442,10 +447,8 @@ def test_solver():
     solver = NOCTVDSolver(terrain, model, config)
     
     # Initial state
-    state = FlowState.zeros((terrain.rows, terrain.cols))
     release = terrain.create_release_zone(5, 12, 3, 2.0)
-    state.h_solid = release * 0.7
-    state.h_fluid = release * 0.3
+    state = FlowState.from_release(release, solid_frac=0.7)
     
     initial_volume = (state.h_solid.sum() + state.h_fluid.sum()) * terrain.cell_size**2
     print(f"\n1. Initial volume: {initial_volume:.0f} m³")
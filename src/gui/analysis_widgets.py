@@ -350,8 +350,10 @@ class HydrographWidget(QWidget):
         # Show max flow extent
         if self.outputs:
             max_h = np.zeros((self.terrain.rows, self.terrain.cols))
+            h_total = np.empty_like(max_h)
             for _, state in self.outputs:
-                max_h = np.maximum(max_h, state.h_solid + state.h_fluid)
+                np.add(state.h_solid, state.h_fluid, out=h_total)
+                np.maximum(max_h, h_total, out=max_h)
             masked = np.ma.masked_where(max_h < 0.01, max_h)
             self.map_ax.imshow(masked, cmap='YlOrRd', alpha=0.4, origin='upper', aspect='equal')
 
@@ -47,7 +47,6 @@ class SimulationWorker(QThread):
             solver = NOCTVDSolver(self.terrain, model, config)
             
             # Initial state
-            state = FlowState.zeros((self.terrain.rows, self.terrain.cols))
             if self.release_zone is not None:
                 release = self.release_zone
             else:
@@ -57,8 +56,7 @@ class SimulationWorker(QThread):
                     self.terrain.cols // 2,
                     10, 5.0
                 )
-            state.h_solid = release * 0.7
-            state.h_fluid = release * 0.3
+            state = FlowState.from_release(release, solid_frac=0.7)
             
             # Run with progress callback
             def callback(prog, t, step):
@@ -88,6 +86,7 @@ class MainWindow(QMainWindow):
         super().__init__()
         self.terrain = None
         self.outputs = None
+        self.output_params = None
         self.worker = None
         self.release_zone = None
         
@@ -712,6 +711,7 @@ class MainWindow(QMainWindow):
     def _on_finished(self, outputs):
         """Handle simulation completion."""
         self.outputs = outputs
+        self.output_params = self.worker.params
         self.btn_run.setEnabled(True)
         self.btn_cancel.setEnabled(False)
         self.btn_view_3d.setEnabled(True)
@@ -805,16 +805,26 @@ class MainWindow(QMainWindow):
         
         if folder:
             try:
+                from src.core.flow_model import FlowParameters, update_maxima
                 from src.io.results import ResultsExporter, SimulationResults
                 
+                # All three hazard maps in one parallel pass per frame
+                flow_params = FlowParameters(**self.output_params)
                 max_h = np.zeros_like(self.terrain.elevation)
+                max_v = np.zeros_like(max_h)
+                max_p = np.zeros_like(max_h)
                 for _, s in self.outputs:
-                    max_h = np.maximum(max_h, s.h_solid + s.h_fluid)
+                    update_maxima(s.h_solid, s.h_fluid,
+                                  s.u_solid, s.v_solid, s.u_fluid, s.v_fluid,
+                                  flow_params.solid_density, flow_params.fluid_density,
+                                  max_h, max_v, max_p)
                 
                 _, final = self.outputs[-1]
                 results = SimulationResults(
                     times=[t for t, _ in self.outputs],
                     max_flow_height=max_h,
+                    max_velocity=max_v,
+                    max_pressure=max_p,
                     final_h_solid=final.h_solid,
                     final_h_fluid=final.h_fluid,
                 )
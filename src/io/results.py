@@ -7,7 +7,7 @@ Handles exporting simulation results to various formats.
 import numpy as np
 from pathlib import Path
 from dataclasses import dataclass, field
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Union
 import json
 from datetime import datetime
 
@@ -16,8 +16,8 @@ from datetime import datetime
 class SimulationResults:
     """Container for simulation results."""
     
-    # Time data
-    times: List[float] = field(default_factory=list)
+    # Time data (list or 1-D array of output times)
+    times: Union[List[float], np.ndarray] = field(default_factory=list)
     
     # Maximum fields (hazard maps)
     max_flow_height: Optional[np.ndarray] = None
@@ -174,7 +174,7 @@ class ResultsExporter:
         
         summary = {
             'timestamp': datetime.now().isoformat(),
-            'simulation_time': max(results.times) if results.times else 0,
+            'simulation_time': float(np.max(results.times)) if len(results.times) else 0,
             'output_frames': len(results.times),
             'cell_size_m': cell_size,
         }
@@ -196,7 +196,7 @@ class ResultsExporter:
         return summary
     
     def export_snapshots(self, snapshots: List[Dict[str, np.ndarray]],
-                         times: List[float]) -> None:
+                         times: Union[List[float], np.ndarray]) -> None:
         """Export time-series snapshots for animation."""
         snapshots_dir = self.output_dir / 'snapshots'
         snapshots_dir.mkdir(exist_ok=True)
@@ -209,7 +209,7 @@ class ResultsExporter:
         # Save time index
         index_path = snapshots_dir / 'time_index.json'
         with open(index_path, 'w') as f:
-            json.dump({'times': times, 'count': len(times)}, f)
+            json.dump({'times': [float(t) for t in times], 'count': len(times)}, f)
 
 
 def test_results():
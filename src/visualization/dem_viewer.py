@@ -650,7 +650,7 @@ class AnimationController:
     def seek_time(self, time: float) -> None:
         """Jump to specific simulation time."""
         times = self.viewer.snapshot_times
-        if not times:
+        if len(times) == 0:
             return
         
         # Find closest frame
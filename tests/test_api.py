@@ -121,6 +121,21 @@ class TestFlowModelAPI:
         assert state.u_solid.shape == (50, 40)
         assert state.v_solid.shape == (50, 40)
     
+    def test_flow_state_from_release(self):
+        """Test creating a flow state from a release zone."""
+        from src import FlowState, Terrain
+        
+        terrain = Terrain.create_synthetic_slope(rows=50, cols=40)
+        release = terrain.create_release_zone(10, 20, 5, 3.0)
+        
+        state = FlowState.from_release(release, solid_frac=0.6)
+        
+        np.testing.assert_allclose(state.h_solid, release * 0.6)
+        np.testing.assert_allclose(state.h_total, release)
+        assert state.u_solid.shape == release.shape
+        assert not state.u_solid.any()
+        assert not state.v_fluid.any()
+    
     def test_create_two_phase_model(self):
         """Test creating two-phase flow model."""
         from src import TwoPhaseFlowModel, FlowParameters
@@ -133,6 +148,74 @@ class TestFlowModelAPI:
         
         assert model is not None
         assert model.params.solid_density == 2500.0
+    
+    def test_update_maxima_matches_model(self):
+        """Test fused hazard-map update against the model's array formulas."""
+        from src import FlowState, TwoPhaseFlowModel, FlowParameters
+        from src.core.flow_model import update_maxima
+        
+        rng = np.random.default_rng(0)
+        state = FlowState.zeros((30, 20))
+        state.h_solid = rng.random((30, 20)) * 2.0
+        state.h_fluid = rng.random((30, 20))
+        state.h_solid[:5] = 0.0
+        state.h_fluid[:5] = 0.0
+        state.u_solid = rng.normal(size=(30, 20)) * 5.0
+        state.v_solid = rng.normal(size=(30, 20)) * 5.0
+        state.u_fluid = rng.normal(size=(30, 20)) * 8.0
+        state.v_fluid = rng.normal(size=(30, 20)) * 8.0
+        
+        params = FlowParameters(solid_density=2500.0, fluid_density=1100.0)
+        model = TwoPhaseFlowModel(params)
+        
+        max_height = np.full((30, 20), 0.5)
+        max_velocity = np.zeros((30, 20))
+        max_pressure = np.zeros((30, 20))
+        update_maxima(state.h_solid, state.h_fluid, state.u_solid, state.v_solid,
+                      state.u_fluid, state.v_fluid,
+                      params.solid_density, params.fluid_density,
+                      max_height, max_velocity, max_pressure)
+        
+        np.testing.assert_allclose(max_height, np.maximum(0.5, state.h_total))
+        np.testing.assert_allclose(max_velocity, state.speed_solid)
+        np.testing.assert_allclose(max_pressure, model.compute_impact_pressure(state))
+        
+        frame = np.empty((30, 20), dtype=np.float32)
+        grown, peak_speed = update_maxima(
+            state.h_solid, state.h_fluid, state.u_solid, state.v_solid,
+            state.u_fluid, state.v_fluid,
+            params.solid_density, params.fluid_density,
+            max_height, max_velocity, max_pressure, h_total_out=frame)
+        np.testing.assert_allclose(frame, state.h_total, rtol=1e-6)
+        
+        # Re-folding the same frame changes nothing; the peak speed covers
+        # both phases
+        assert grown == 0
+        assert peak_speed == pytest.approx(
+            max(state.speed_solid.max(), state.speed_fluid.max()))
+        assert state.speed_fluid.max() > state.speed_solid.max()
+    
+    def test_total_volume(self):
+        """Test fused volume reduction against separate NumPy sums."""
+        from src.core.flow_model import total_volume
+        
+        rng = np.random.default_rng(1)
+        h_solid = rng.random((30, 20))
+        h_fluid = rng.random((30, 20))
+        
+        assert total_volume(h_solid, h_fluid) == pytest.approx(h_solid.sum() + h_fluid.sum())
+    
+    def test_first_active_row(self):
+        """Test runout row scan against the full-grid reduction."""
+        from src.core.flow_model import first_active_row
+        
+        field = np.zeros((30, 20), dtype=np.float32)
+        assert first_active_row(field) == 0
+        
+        field[12, 7] = 0.5
+        field[20:, :] = 1.0
+        assert first_active_row(field) == 12
+        assert first_active_row(field) == np.argmax(field.sum(axis=1) > 0)
 
 
 class TestSolverAPI:
@@ -117,6 +117,28 @@ class TestFullSimulation:
             assert Path(exported['max_height']).exists()
             assert Path(exported['summary']).exists()
     
+    def test_export_with_array_times(self):
+        """Test exporting results whose times are a NumPy array."""
+        import json
+        
+        results = SimulationResults(
+            times=np.arange(6, dtype=np.float64),
+            max_flow_height=np.ones((10, 10)),
+        )
+        
+        with tempfile.TemporaryDirectory() as tmpdir:
+            exporter = ResultsExporter(tmpdir, {'cell_size': 10.0})
+            exported = exporter.export_results(results, format='npy')
+            exporter.export_snapshots([{'h': np.zeros((10, 10))}] * 6, results.times)
+            
+            with open(exported['summary']) as f:
+                summary = json.load(f)
+            assert summary['simulation_time'] == 5.0
+            assert summary['output_frames'] == 6
+            
+            with open(Path(tmpdir) / 'snapshots' / 'time_index.json') as f:
+                assert json.load(f)['times'] == [0.0, 1.0, 2.0, 3.0, 4.0, 5.0]
+    
     def test_parameter_save_load(self):
         """Test parameter serialization."""
         params = SimulationParameters.create_debris_flow_preset()
@@ -112,6 +112,18 @@ class TestNOCTVDSolver:
         times = [t for t, _ in outputs]
         assert all(times[i] <= times[i+1] for i in range(len(times)-1))
     
+    def test_run_simulation_zero_duration(self, solver, initial_state):
+        """Test that t_end=0 returns the initial state and reports completion."""
+        ticks = []
+        outputs = solver.run_simulation(
+            initial_state,
+            t_end=0.0,
+            progress_callback=lambda progress, t, step: ticks.append((progress, t, step))
+        )
+        
+        assert len(outputs) == 1
+        assert ticks == [(1.0, 0.0, 0)]
+    
     def test_flow_propagation(self, solver, initial_state, terrain):
         """Test that flow actually propagates downslope."""
         # Find center of mass initially